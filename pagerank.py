@@ -5,6 +5,8 @@ import sys
 
 DAMPING = 0.85
 SAMPLES = 10000
+DIRECT_SOLVE_LIMIT = 20
+LINK_PATTERN = re.compile(rb"<a\s+[^>]*?href=\"([^\"]*)\"")
 
 
 def main():
@@ -33,10 +35,14 @@ def crawl(directory):
     for filename in os.listdir(directory):
         if not filename.endswith(".html"):
             continue
-        with open(os.path.join(directory, filename)) as f:
+        # Scan raw bytes and decode only the matched links, not the whole file
+        with open(os.path.join(directory, filename), "rb") as f:
             contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
-            pages[filename] = set(links) - {filename}
+            links = set(
+                link.decode("utf-8", "replace")
+                for link in LINK_PATTERN.findall(contents)
+            )
+            pages[filename] = links - {filename}
 
     # Only include links to other pages in the corpus
     for filename in pages:
@@ -57,25 +63,32 @@ def transition_model(corpus, page, damping_factor):
     linked to by `page`. With probability `1 - damping_factor`, choose
     a link at random chosen from all pages in the corpus.
     """
-    transition_dictionary = {}
-
-    linked_pages = corpus.get(page)
-
     probability_random = (1 - damping_factor) / len(corpus)
+    transition_dictionary = {other_page: probability_random for other_page in corpus}
 
+    linked_pages = corpus[page]
     if len(linked_pages) > 0:
         probability_linked = damping_factor / len(linked_pages)
 
-        for page in linked_pages:
-            transition_dictionary[page] = probability_linked + probability_random
-
-    for page in corpus:
-        if page not in transition_dictionary:
-            transition_dictionary[page] = probability_random
+        for linked_page in linked_pages:
+            transition_dictionary[linked_page] += probability_linked
 
     return transition_dictionary
 
 
+def index_corpus(corpus):
+    """
+    Number the pages of `corpus` so they can be stored in plain lists.
+
+    Return a sorted list of page names, and a list where entry `i` holds
+    the indices of the pages linked to by page `i`.
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    links = [[index[link] for link in corpus[page]] for page in pages]
+    return pages, links
+
+
 def sample_pagerank(corpus, damping_factor, n):
     """
     Return PageRank values for each page by sampling `n` pages
@@ -86,86 +99,149 @@ def sample_pagerank(corpus, damping_factor, n):
     PageRank values should sum to 1.
     """
 
-    sample_list = []
+    pages, links = index_corpus(corpus)
+    num_pages = len(pages)
+    visits = [0] * num_pages
 
-    random_page = random.sample(sorted(corpus), 1)[0]
-    current_page = random_page
+    # With probability `damping_factor` follow one of the current page's
+    # links, chosen uniformly; otherwise, or if it has none, jump to any page
+    current_page = random.randrange(num_pages)
 
-    i = 0
-    while i < n:
-        sample_list.append(current_page)
-        transition_dict = transition_model(corpus, current_page, damping_factor)
-        list_of_probabilities = []
-
-        if len(corpus.get(current_page)) > 0:
-            for page in sorted(corpus.get(current_page)):
-                list_of_probabilities.append(transition_dict.get(page))
-            current_page = random.choices(list(corpus.get(current_page)), list_of_probabilities)[0]
+    for i in range(n):
+        visits[current_page] += 1
+        r = random.random()
+        page_links = links[current_page]
+        if r < damping_factor and len(page_links) > 0:
+            current_page = page_links[int(r / damping_factor * len(page_links))]
         else:
-            for j in range(len(corpus)):
-                list_of_probabilities.append((1 - damping_factor) / len(corpus))
-            current_page = random.choices(sorted(corpus), list_of_probabilities)[0]
-        i += 1
-
-    sample_dictionary = {}
-    for page in corpus:
-        if page in sample_list:
-            sample_dictionary[page] = sample_list.count(page) / n
+            current_page = random.randrange(num_pages)
+
+    if n == 0:
+        return {page: 0 for page in pages}
+    return {page: visits[i] / n for i, page in enumerate(pages)}
+
+
+def solve_pagerank(corpus, damping_factor):
+    """
+    Return PageRank values for each page by solving the PageRank equations
+    directly with Gaussian elimination. The dense solve costs O(n^3), so it
+    only beats iteration on tiny corpora (up to about 20 pages).
+
+    Return a dictionary where keys are page names, and values are
+    their PageRank value (a value between 0 and 1). All PageRank values
+    should sum to 1. Return None if the equations have no unique solution,
+    as happens when `damping_factor` is 1.
+    """
+
+    pages, links = index_corpus(corpus)
+    n = len(pages)
+
+    # Build (I - d * M) x = (1 - d) / n, where column i of M spreads page i's
+    # rank evenly over its links, or over every page if it has none
+    matrix = [[0.0] * n for page in range(n)]
+    for page_i, linked_pages in enumerate(links):
+        if len(linked_pages) > 0:
+            for page_p in linked_pages:
+                matrix[page_p][page_i] -= damping_factor / len(linked_pages)
         else:
-            sample_dictionary[page] = 0
+            for page_p in range(n):
+                matrix[page_p][page_i] -= damping_factor / n
+    for page in range(n):
+        matrix[page][page] += 1
+        matrix[page].append((1 - damping_factor) / n)
+
+    # Gaussian elimination with partial pivoting
+    for column in range(n):
+        pivot = max(range(column, n), key=lambda row: abs(matrix[row][column]))
+        if abs(matrix[pivot][column]) < 1e-12:
+            return None
+        matrix[column], matrix[pivot] = matrix[pivot], matrix[column]
+        pivot_row = matrix[column]
+        for row in range(column + 1, n):
+            factor = matrix[row][column] / pivot_row[column]
+            if factor != 0:
+                current_row = matrix[row]
+                for k in range(column, n + 1):
+                    current_row[k] -= factor * pivot_row[k]
+
+    page_ranks = [0.0] * n
+    for row in reversed(range(n)):
+        value = matrix[row][n] - sum(
+            matrix[row][k] * page_ranks[k] for k in range(row + 1, n)
+        )
+        page_ranks[row] = value / matrix[row][row]
 
-    return sample_dictionary
+    total = sum(page_ranks)
+    return {page: page_ranks[i] / total for i, page in enumerate(pages)}
 
 
 def iterate_pagerank(corpus, damping_factor):
     """
     Return PageRank values for each page by iteratively updating
-    PageRank values until convergence.
+    PageRank values until convergence. Corpora of at most
+    `DIRECT_SOLVE_LIMIT` pages are instead solved exactly with
+    `solve_pagerank`, which is faster at that size; iteration is used
+    when that solve has no unique answer.
 
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
 
-    page_rank_dictionary = {}
-    threshold = 0.001
-    n = len(corpus)
-    is_over = n
-
-    for page in corpus:
-        page_rank_dictionary[page] = 1 / n
-
-    while is_over > 0:
-        for page_p in corpus:
-            list_of_incoming_pages = []
-            for page_i in corpus:
-                if page_p in corpus.get(page_i) or len(corpus.get(page_i)) == 0:
-                    list_of_incoming_pages.append(page_i)
-
-            old_pagerank = page_rank_dictionary.get(page_p)
-
-            summation = 0
-
-            if len(list_of_incoming_pages) > 0:
-                for incoming in list_of_incoming_pages:
-                    num_links = len(corpus.get(incoming))
-                    if num_links == 0:
-                        num_links = len(corpus)
-                    summation += page_rank_dictionary.get(incoming) / num_links
-            else:
-                for incoming in corpus:
-                    if len(corpus.get(incoming)) == 0:
-                        summation += page_rank_dictionary.get(incoming) / len(corpus)
-
-            new_pagerank = (1 - damping_factor) / n + damping_factor * summation
-            page_rank_dictionary[page_p] = new_pagerank
-
-            if abs(new_pagerank - old_pagerank) <= threshold:
-                is_over -= 1
-            else:
-                is_over = n
-
-    return page_rank_dictionary
+    if len(corpus) <= DIRECT_SOLVE_LIMIT and damping_factor < 1:
+        page_rank_dictionary = solve_pagerank(corpus, damping_factor)
+        if page_rank_dictionary is not None:
+            return page_rank_dictionary
+
+    pages, links = index_corpus(corpus)
+    # Converged once the total change over all pages drops below n * threshold.
+    # Periodic graphs never converge when damping_factor is 1, so stop after
+    # `max_iterations` sweeps and return the latest values
+    threshold = 1e-6
+    max_iterations = 1000
+    n = len(pages)
+
+    page_ranks = [1 / n] * n
+
+    # Precompute the reverse adjacency once, so each sweep only walks real in-edges
+    num_links = [len(linked_pages) for linked_pages in links]
+    incoming_pages = [[] for page in range(n)]
+    for page_i, linked_pages in enumerate(links):
+        for page_p in linked_pages:
+            incoming_pages[page_p].append(page_i)
+    dangling_pages = [page for page in range(n) if num_links[page] == 0]
+    # Damped share of rank sent along each link. Dangling pages get 0 here;
+    # their rank is spread separately below
+    link_weights = [damping_factor / count if count > 0 else 0 for count in num_links]
+    random_pagerank = (1 - damping_factor) / n
+
+    # Two rank buffers: read from one, write the next sweep into the other, swap
+    new_page_ranks = list(page_ranks)
+
+    for iteration in range(max_iterations):
+        # A page with no links is treated as linking to every page, itself
+        # included. That mass, like the random jump, is the same for every
+        # page, so both fold into one base value per sweep
+        dangling_sum = sum(page_ranks[page] for page in dangling_pages)
+        base_pagerank = random_pagerank + damping_factor * dangling_sum / n
+
+        # Each sweep is one sparse matrix-vector product: every linking page
+        # splits its rank evenly, and each page gathers the shares pointing at it
+        shares = [rank * weight for rank, weight in zip(page_ranks, link_weights)]
+        # map() with the bound lookup keeps the gather loop in C
+        share_of = shares.__getitem__
+        for page_p in range(n):
+            new_page_ranks[page_p] = base_pagerank + sum(
+                map(share_of, incoming_pages[page_p])
+            )
+
+        error = sum(abs(new - old) for new, old in zip(new_page_ranks, page_ranks))
+        page_ranks, new_page_ranks = new_page_ranks, page_ranks
+
+        if error < n * threshold:
+            break
+
+    return dict(zip(pages, page_ranks))
 
 
 if __name__ == "__main__":